@@ -1,7 +1,11 @@
 import streamlit as st
 from chatbot import MedicalChatbot
+from conversation_context import ConversationContext
 import time
 
+# Keep per-session memory bounded however long a conversation runs
+MAX_HISTORY_MESSAGES = 40
+
 # Page configuration
 st.set_page_config(
     page_title="Medical Q&A Chatbot",
@@ -60,6 +64,7 @@ def main():
         show_entities = st.checkbox("Show Medical Entities", value=True)
         show_similar = st.checkbox("Show Similar Questions", value=False)
         confidence_threshold = st.slider("Confidence Threshold", 0.0, 1.0, 0.5, 0.1)
+        clear_chat = st.button("Clear Conversation")
         
         st.header("⚠️ Disclaimer")
         st.warning("This chatbot provides educational information only. Always consult healthcare professionals for medical advice.")
@@ -105,8 +110,10 @@ def main():
     # Main chat interface
     if chatbot.is_initialized:
         # Chat history
-        if "messages" not in st.session_state:
+        if "messages" not in st.session_state or clear_chat:
             st.session_state.messages = []
+        if "context" not in st.session_state or clear_chat:
+            st.session_state.context = ConversationContext()
         
         # Display chat history
         for message in st.session_state.messages:
@@ -115,7 +122,13 @@ def main():
                     st.write(message["content"])
             else:
                 with st.chat_message("assistant"):
-                    st.write(message["content"])
+                    # Answers are kept as corpus row indices and re-read on display
+                    if message.get("answer_index") is not None:
+                        st.write(chatbot.add_disclaimer(
+                            chatbot.get_answer(message["answer_index"], message["entities"])
+                        ))
+                    else:
+                        st.write(message["content"])
                     
                     # Show entities if enabled
                     if show_entities and "entities" in message:
@@ -143,24 +156,29 @@ def main():
             
             # Get bot response
             with st.spinner("Thinking..."):
-                response = chatbot.get_response(user_question)
-                
-                # Add disclaimer
-                final_answer = chatbot.add_disclaimer(response['answer'])
+                response = chatbot.get_response(user_question, st.session_state.context)
                 
-                # Add bot message to history
+                # Add bot message to history, storing the answer's corpus row
+                # rather than its text so long answers are not kept per session
                 bot_message = {
                     "role": "assistant",
-                    "content": final_answer,
-                    "entities": response['entities'],
+                    "answer_index": response['answer_index'],
+                    "entities": {k: v for k, v in response['entities'].items() if v},
                     "confidence": response['confidence'],
                     "source": response['source']
                 }
+                if response['answer_index'] is None:
+                    # Fallback answers have no corpus row
+                    bot_message["content"] = chatbot.add_disclaimer(response['answer'])
                 st.session_state.messages.append(bot_message)
+                st.session_state.messages = st.session_state.messages[-MAX_HISTORY_MESSAGES:]
             
             # Show similar questions if enabled
             if show_similar:
-                similar_questions = chatbot.get_similar_questions(user_question, top_k=3)
+                similar_questions = chatbot.get_similar_questions(
+                    response['search_question'], top_k=3,
+                    query_embedding=response['query_embedding']
+                )
                 if similar_questions:
                     st.subheader("Similar Questions:")
                     for i, sq in enumerate(similar_questions, 1):
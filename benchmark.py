@@ -0,0 +1,136 @@
+import os
+import random
+import tempfile
+import string
+import time
+import tracemalloc
+import pandas as pd
+from corpus_store import CorpusStore
+from query_normalizer import QueryNormalizer
+
+def _random_word(rng: random.Random) -> str:
+    return ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+
+def _synthetic_corpus(num_rows: int) -> pd.DataFrame:
+    """Generate a MedQuAD-sized corpus with long answers"""
+    rng = random.Random(0)
+    words = ['diabetes', 'insulin', 'blood', 'pressure', 'treatment', 'symptoms',
+             'patients', 'disease', 'therapy', 'chronic', 'condition', 'doctor']
+    # Stand-ins for the long tail of disease and drug names
+    names = [_random_word(rng) for _ in range(num_rows // 2)]
+    return pd.DataFrame({
+        'question': [f"What is {rng.choice(names)} {' '.join(rng.choices(words, k=5))}?"
+                     for _ in range(num_rows)],
+        'answer': [' '.join(rng.choices(words, k=250)) for _ in range(num_rows)],
+        'source': [f"{rng.randint(1, 11)}_QA" for _ in range(num_rows)],
+        'file': [f"{i}.xml" for i in range(num_rows)]
+    })
+
+def _measure(func):
+    """Return (result, seconds, peak traced bytes) for func()"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def benchmark_corpus(num_rows: int = 20000, top_k: int = 5):
+    """Compare startup cost of the CSV corpus against CorpusStore"""
+    df = _synthetic_corpus(num_rows)
+    hits = random.Random(1).sample(range(num_rows), top_k)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'medquad_processed.csv')
+        store_path = os.path.join(tmp, 'medquad_corpus')
+        df.to_csv(csv_path, index=False)
+        CorpusStore.write(df, store_path).close()
+        del df
+        
+        csv_df, csv_time, csv_peak = _measure(lambda: pd.read_csv(csv_path))
+        _, csv_fetch, _ = _measure(lambda: [csv_df.iloc[i]['answer'] for i in hits])
+        
+        store, store_time, store_peak = _measure(lambda: CorpusStore.open(store_path))
+        _, store_fetch, _ = _measure(lambda: [store.get(i, 'answer') for i in hits])
+        store.close()
+        
+        # The real startup also counts question words and builds the spelling index
+        def open_with_normalizer():
+            store = CorpusStore.open(store_path)
+            QueryNormalizer(QueryNormalizer.count_words(store.column('question')))
+            return store
+        
+        store, startup_time, startup_peak = _measure(open_with_normalizer)
+        store.close()
+    
+    print(f"Corpus load ({num_rows} rows):")
+    print(f"  CSV:         {csv_time * 1000:8.1f} ms  peak {csv_peak / 2**20:7.1f} MiB")
+    print(f"  CorpusStore: {store_time * 1000:8.1f} ms  peak {store_peak / 2**20:7.1f} MiB")
+    print(f"  + normalizer:{startup_time * 1000:8.1f} ms  peak {startup_peak / 2**20:7.1f} MiB")
+    print(f"Top-{top_k} answer fetch:")
+    print(f"  CSV:         {csv_fetch * 1000:8.3f} ms")
+    print(f"  CorpusStore: {store_fetch * 1000:8.3f} ms")
+
+def _misspell(word: str, rng: random.Random) -> str:
+    """Apply one random deletion, insertion or substitution"""
+    i = rng.randrange(len(word))
+    edit = rng.choice(['delete', 'insert', 'substitute'])
+    if edit == 'delete':
+        return word[:i] + word[i + 1:]
+    letter = rng.choice(string.ascii_lowercase)
+    if edit == 'insert':
+        return word[:i] + letter + word[i:]
+    return word[:i] + letter + word[i + 1:]
+
+def benchmark_normalizer(vocab_size: int = 5000, num_queries: int = 1000):
+    """Measure query normalisation overhead on a TF-IDF sized vocabulary"""
+    rng = random.Random(0)
+    vocabulary = {}
+    while len(vocabulary) < vocab_size:
+        vocabulary[_random_word(rng)] = rng.randint(1, 500)
+    words = list(vocabulary)
+    queries = [
+        ' '.join(_misspell(w, rng) if rng.random() < 0.3 else w for w in rng.sample(words, 6))
+        for _ in range(num_queries)
+    ]
+    
+    normalizer, build_time, build_peak = _measure(lambda: QueryNormalizer(vocabulary))
+    _, cold_time, _ = _measure(lambda: [normalizer.normalize(q) for q in queries])
+    _, warm_time, _ = _measure(lambda: [normalizer.normalize(q) for q in queries])
+    
+    print(f"Query normalizer ({vocab_size} words):")
+    print(f"  Build:        {build_time * 1000:8.1f} ms  peak {build_peak / 2**20:7.1f} MiB")
+    print(f"  Cold query:   {cold_time / num_queries * 1000:8.3f} ms")
+    print(f"  Cached query: {warm_time / num_queries * 1000:8.3f} ms")
+
+def check_normalizer():
+    """Sanity check that correct English words are never rewritten"""
+    vocabulary = QueryNormalizer.count_words([
+        "What diet helps diabetes?", "Why rest after a stroke?", "rest and diet",
+        "What causes a cough?", "How to treat a rash?", "cough and rash"
+    ])
+    normalizer = QueryNormalizer(
+        vocabulary,
+        protected_words=['diabetes', 'diet', 'rest', 'cough', 'rash', 'stroke', 'fever'],
+        english_words=['best', 'die', 'father', 'tough', 'day', 'wash']
+    )
+    cases = {
+        "what is the best diet for diabetes": "what is the best diet for diabetes",
+        "my father died of a stroke": "my father died of a stroke",
+        "tough day with fever": "tough day with fever",
+        "how to wash a rash": "how to wash a rash",
+        "diabetis diet": "diabetes diet",
+    }
+    for query, expected in cases.items():
+        result = normalizer.normalize(query)
+        assert result == expected, f"{query!r} -> {result!r}, expected {expected!r}"
+    print("Query normalizer checks passed")
+
+def main():
+    check_normalizer()
+    benchmark_corpus()
+    benchmark_normalizer()
+
+if __name__ == "__main__":
+    main()
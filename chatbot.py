@@ -1,7 +1,10 @@
 from data_processor import MedQuADProcessor
 from entity_recognizer import MedicalEntityRecognizer
 from retriever import MedicalRetriever
-from typing import Dict, List
+from query_normalizer import QueryNormalizer
+from conversation_context import ConversationContext
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from typing import Dict, List, Optional
 import os
 
 class MedicalChatbot:
@@ -9,34 +12,39 @@ class MedicalChatbot:
         self.processor = MedQuADProcessor()
         self.entity_recognizer = MedicalEntityRecognizer()
         self.retriever = MedicalRetriever()
+        self.normalizer = None
         self.is_initialized = False
     
     def initialize(self):
         """Initialize the chatbot by loading or creating the knowledge base"""
         print("Initializing Medical Chatbot...")
         
-        # Check if processed data exists
-        processed_data_path = "data/medquad_processed.csv"
         index_path = "data/retrieval_index"
         
-        if os.path.exists(processed_data_path):
-            print("Loading existing processed data...")
-            import pandas as pd
-            qa_df = pd.read_csv(processed_data_path)
-        else:
-            print("Processing MedQuAD dataset...")
-            qa_df = self.processor.process_dataset()
+        # Only offsets are read here; answers stay on disk until retrieved
+        corpus = self.processor.load_corpus()
         
         # Load or build retrieval index
-        if not self.retriever.load_index(index_path):
+        if not self.retriever.load_index(corpus, index_path):
             print("Building retrieval index...")
-            self.retriever.build_index(qa_df, index_path)
+            self.retriever.build_index(corpus, index_path)
+        
+        # Spelling correction works against the words the index actually knows
+        medical_terms = set().union(*self.entity_recognizer.medical_entities.values())
+        self.normalizer = QueryNormalizer(
+            self.retriever.get_vocabulary(),
+            protected_words=medical_terms,
+            # TF-IDF drops sklearn's stop words, which NLTK's list does not fully cover
+            ignore_words=self.entity_recognizer.stop_words | ENGLISH_STOP_WORDS,
+            english_words=self.entity_recognizer.english_words
+        )
         
         self.is_initialized = True
         print("Chatbot initialized successfully!")
     
-    def get_response(self, user_question: str) -> Dict:
-        """Get response for user question"""
+    def get_response(self, user_question: str,
+                     context: Optional[ConversationContext] = None) -> Dict:
+        """Get response for user question, resolving follow-ups against context"""
         if not self.is_initialized:
             return {
                 'answer': 'Chatbot is not initialized. Please wait...',
@@ -45,11 +53,30 @@ class MedicalChatbot:
                 'source': 'error'
             }
         
+        # Expand abbreviations and fix misspellings before retrieval
+        normalized_question = self.normalizer.normalize(user_question)
+        
         # Extract medical entities
-        entities = self.entity_recognizer.extract_entities(user_question)
+        entities = self.entity_recognizer.extract_entities(normalized_question)
+        
+        # Carry the previous topic into follow-ups like "how is it treated?"
+        search_question = normalized_question
+        word_counts = self.normalizer.word_counts
+        follow_up = (context is not None
+                     and context.is_follow_up(normalized_question, entities, word_counts))
+        if follow_up:
+            search_question = context.rewrite(normalized_question)
+        
+        turn_embedding = self.retriever.encode_query(search_question)
+        query_embedding = turn_embedding
+        if follow_up and turn_embedding is not None:
+            query_embedding = context.blend(turn_embedding)
         
         # Get best answer
-        result = self.retriever.get_best_answer(user_question)
+        result = self.retriever.get_best_answer(search_question, query_embedding=query_embedding)
+        
+        if context is not None:
+            context.update(normalized_question, entities, follow_up, word_counts, turn_embedding)
         
         # Enhance answer with entity information
         enhanced_answer = self._enhance_answer(result['answer'], entities)
@@ -59,7 +86,11 @@ class MedicalChatbot:
             'entities': entities,
             'confidence': result['score'],
             'source': result['source'],
-            'original_question': result['question']
+            'original_question': result['question'],
+            'normalized_question': normalized_question,
+            'search_question': search_question,
+            'query_embedding': query_embedding,
+            'answer_index': result.get('index')
         }
     
     def _enhance_answer(self, answer: str, entities: Dict) -> str:
@@ -75,12 +106,23 @@ class MedicalChatbot:
         
         return answer + enhancement
     
-    def get_similar_questions(self, user_question: str, top_k: int = 3) -> List[Dict]:
-        """Get similar questions for user reference"""
+    def get_answer(self, answer_index: int, entities: Dict) -> str:
+        """Rebuild an answer from its corpus row, e.g. when redrawing chat history"""
+        answer = self.retriever.corpus.get(answer_index, 'answer')
+        return self._enhance_answer(answer, entities)
+    
+    def get_similar_questions(self, user_question: str, top_k: int = 3,
+                              query_embedding=None) -> List[Dict]:
+        """Get similar questions for user reference.
+        
+        Pass a response's search_question and query_embedding so follow-ups
+        search the same rewritten query as the main answer.
+        """
         if not self.is_initialized:
             return []
         
-        return self.retriever.retrieve(user_question, top_k)
+        return self.retriever.retrieve(self.normalizer.normalize(user_question), top_k,
+                                       query_embedding=query_embedding)
     
     def add_disclaimer(self, response: str) -> str:
         """Add medical disclaimer to response"""
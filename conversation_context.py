@@ -0,0 +1,105 @@
+import re
+import numpy as np
+from typing import Dict, List, Optional
+
+class ConversationContext:
+    """Compact per-session state for resolving follow-up questions.
+
+    Only the current topic's medical terms, the previous question's rare
+    words and a float16 copy of the last query embedding are kept, so a
+    session stays around 1 KB with the FAISS backend (mostly the 384-dim
+    embedding) and a few hundred bytes with TF-IDF, however long the
+    conversation runs.
+    """
+
+    __slots__ = ('max_entities', 'rewrite_terms', 'blend_weight', 'rare_word_count',
+                 'topic_entities', 'last_words', 'last_embedding')
+
+    # Pronouns that refer back to the previous topic on their own
+    ANAPHORIC_WORDS = frozenset({'it', 'its', 'they', 'them', 'their'})
+    # Demonstratives only count when followed by one of these, e.g. "this condition"
+    DEMONSTRATIVE_WORDS = frozenset({'this', 'that', 'these', 'those'})
+    TOPIC_NOUNS = frozenset({
+        'condition', 'conditions', 'disease', 'diseases', 'disorder', 'disorders',
+        'illness', 'problem', 'syndrome', 'medication', 'medications', 'drug',
+        'drugs', 'medicine', 'treatment', 'treatments'
+    })
+    MIN_CONTENT_WORD_LENGTH = 4
+    MAX_LAST_WORDS = 8
+
+    def __init__(self, max_entities: int = 5, rewrite_terms: int = 2,
+                 blend_weight: float = 0.3, rare_word_count: int = 50):
+        self.max_entities = max_entities
+        self.rewrite_terms = rewrite_terms
+        self.blend_weight = blend_weight
+        # Words in fewer questions than this are probably entity names
+        self.rare_word_count = rare_word_count
+        self.topic_entities = ()
+        self.last_words = ()
+        self.last_embedding = None
+
+    def _content_words(self, words: List[str]) -> List[str]:
+        """Words long enough to name a new topic"""
+        return [word for word in words
+                if len(word) >= self.MIN_CONTENT_WORD_LENGTH
+                and word not in self.TOPIC_NOUNS]
+
+    def _rare_words(self, words: List[str], word_counts: Dict[str, int]) -> List[str]:
+        """Content words uncommon enough in the corpus to be entity names"""
+        return [word for word in self._content_words(words)
+                if word_counts.get(word, 0) < self.rare_word_count]
+
+    def is_follow_up(self, question: str, entities: Dict[str, List[str]],
+                     word_counts: Dict[str, int]) -> bool:
+        """Guess whether a question refers back to the previous turn"""
+        if not self.topic_entities or entities.get('diseases'):
+            return False
+
+        words = re.findall(r"[a-z]+", question.lower())
+        refers_back = any(
+            word in self.ANAPHORIC_WORDS
+            or (word in self.DEMONSTRATIVE_WORDS and next_word in self.TOPIC_NOUNS)
+            for word, next_word in zip(words, words[1:] + [''])
+        )
+        if not refers_back:
+            return False
+
+        # A rare word the last turn didn't use is most likely a new entity
+        return not any(word not in self.last_words and word not in self.topic_entities
+                       for word in self._rare_words(words, word_counts))
+
+    def rewrite(self, question: str) -> str:
+        """Append the current topic's medical terms to a follow-up question"""
+        terms = self.topic_entities[:self.rewrite_terms]
+        return f"{question} {' '.join(terms)}" if terms else question
+
+    def blend(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Mix the previous query embedding into a follow-up's embedding"""
+        if self.last_embedding is None:
+            return query_embedding
+
+        previous = self.last_embedding.astype('float32')
+        blended = (1 - self.blend_weight) * query_embedding + self.blend_weight * previous
+        norm = np.linalg.norm(blended, axis=1, keepdims=True)
+        return blended / np.maximum(norm, 1e-12)
+
+    def update(self, question: str, entities: Dict[str, List[str]], follow_up: bool,
+               word_counts: Dict[str, int], query_embedding: Optional[np.ndarray] = None):
+        """Record this turn's topic, rare words and unblended embedding"""
+        words = re.findall(r"[a-z]+", question.lower())
+
+        # Follow-ups stay on the current topic; otherwise this turn's terms
+        # replace it, known diseases first, then rare words such as names
+        # missing from the entity lists
+        if not follow_up:
+            ordered = (entities.get('diseases', []) + self._rare_words(words, word_counts)
+                       + entities.get('symptoms', []) + entities.get('treatments', []))
+            self.topic_entities = tuple(dict.fromkeys(ordered))[:self.max_entities]
+
+        # is_follow_up only compares rare words, so only those are kept
+        rare_words = self._rare_words(words, word_counts)
+        self.last_words = tuple(dict.fromkeys(rare_words))[:self.MAX_LAST_WORDS]
+
+        # Store this turn's own embedding, not a blend, so older turns don't accumulate
+        if query_embedding is not None:
+            self.last_embedding = query_embedding.astype('float16')
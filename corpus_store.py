@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import mmap
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+class CorpusStore:
+    """Columnar on-disk store for the processed Q&A corpus.
+
+    Each column is kept as two files: ``<column>.bin`` holds the UTF-8 encoded
+    values back to back and ``<column>.off`` holds ``num_rows + 1`` int64 byte
+    offsets into it. Opening a store only reads the offsets; blobs are memory
+    mapped on first access, so answers are decoded only for the rows returned
+    by a search.
+    """
+
+    FORMAT_VERSION = 1
+    COLUMNS = ('question', 'answer', 'source', 'file')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.num_rows = 0
+        self.fingerprint = None
+        self.columns = []
+        self._offsets = {}
+        self._blobs = {}
+        self._files = {}
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a store has been written at path"""
+        return os.path.exists(os.path.join(path, 'meta.json'))
+
+    @classmethod
+    def write(cls, qa_df, path: str) -> 'CorpusStore':
+        """Write a Q&A DataFrame to path and return the opened store"""
+        os.makedirs(path, exist_ok=True)
+        columns = [col for col in cls.COLUMNS if col in qa_df.columns]
+
+        # Drop any old metadata first and write it last, so a partially
+        # written store is never opened
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        # Indexes record the questions' fingerprint to detect a re-processed corpus
+        digest = hashlib.sha1(str(len(qa_df)).encode('utf-8'))
+        for col in columns:
+            values = qa_df[col].fillna('').astype(str).tolist()
+            cls._write_column(path, col, values, digest if col == 'question' else None)
+
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': cls.FORMAT_VERSION,
+                'num_rows': len(qa_df),
+                'columns': columns,
+                'fingerprint': digest.hexdigest()
+            }, f)
+
+        return cls.open(path)
+
+    @staticmethod
+    def _write_column(path: str, column: str, values: List[str], digest=None):
+        """Write one column as a blob plus offsets file, hashing it into digest"""
+        offsets = array('q', [0])
+        with open(os.path.join(path, f"{column}.bin"), 'wb') as f:
+            position = 0
+            for value in values:
+                encoded = value.encode('utf-8')
+                f.write(encoded)
+                if digest is not None:
+                    digest.update(encoded)
+                position += len(encoded)
+                offsets.append(position)
+
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        if digest is not None:
+            digest.update(offsets.tobytes())
+        with open(os.path.join(path, f"{column}.off"), 'wb') as f:
+            offsets.tofile(f)
+
+    @classmethod
+    def open(cls, path: str) -> 'CorpusStore':
+        """Open an existing store, reading only its offsets"""
+        store = cls(path)
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        if meta.get('version') != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus store version: {meta.get('version')}")
+
+        store.num_rows = meta['num_rows']
+        store.columns = meta['columns']
+        store.fingerprint = meta['fingerprint']
+
+        for col in store.columns:
+            offsets = array('q')
+            with open(os.path.join(path, f"{col}.off"), 'rb') as f:
+                offsets.fromfile(f, store.num_rows + 1)
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            store._offsets[col] = offsets
+
+        return store
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def _blob(self, column: str):
+        """Memory map a column blob on first use"""
+        if column not in self._blobs:
+            if column not in self._offsets:
+                raise KeyError(column)
+
+            if self._offsets[column][-1] == 0:
+                # mmap cannot map empty files
+                self._blobs[column] = b''
+            else:
+                f = open(os.path.join(self.path, f"{column}.bin"), 'rb')
+                self._files[column] = f
+                self._blobs[column] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._blobs[column]
+
+    def get(self, idx: int, column: str) -> str:
+        """Get a single value without touching the rest of the column"""
+        if idx < 0 or idx >= self.num_rows:
+            raise IndexError(idx)
+
+        offsets = self._offsets[column]
+        blob = self._blob(column)
+        return blob[offsets[idx]:offsets[idx + 1]].decode('utf-8')
+
+    def row(self, idx: int, columns: Optional[List[str]] = None) -> Dict[str, str]:
+        """Get the requested columns of a row as a dict"""
+        columns = columns or self.columns
+        return {col: self.get(idx, col) for col in columns}
+
+    def column(self, column: str) -> List[str]:
+        """Decode a whole column, e.g. the questions when building an index"""
+        offsets = self._offsets[column]
+        blob = self._blob(column)
+        return [
+            blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+            for i in range(self.num_rows)
+        ]
+
+    def close(self):
+        """Release memory maps and file handles"""
+        for blob in self._blobs.values():
+            if isinstance(blob, mmap.mmap):
+                blob.close()
+        for f in self._files.values():
+            f.close()
+        self._blobs = {}
+        self._files = {}
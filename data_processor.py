@@ -4,10 +4,13 @@ import xml.etree.ElementTree as ET
 from typing import List, Dict, Tuple
 import requests
 import zipfile
+from corpus_store import CorpusStore
 
 class MedQuADProcessor:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
+        self.corpus_path = os.path.join(data_dir, "medquad_corpus")
+        self.legacy_csv_path = os.path.join(data_dir, "medquad_processed.csv")
         self.qa_pairs = []
         
     def download_dataset(self):
@@ -87,10 +90,24 @@ class MedQuADProcessor:
             qa_pairs = self._get_sample_data()
         
         df = pd.DataFrame(qa_pairs)
-        df.to_csv(os.path.join(self.data_dir, 'medquad_processed.csv'), index=False)
+        CorpusStore.write(df, self.corpus_path)
         print(f"Processed {len(qa_pairs)} Q&A pairs")
         return df
     
+    def load_corpus(self) -> CorpusStore:
+        """Open the processed corpus, creating it on first run"""
+        if CorpusStore.exists(self.corpus_path):
+            return CorpusStore.open(self.corpus_path)
+        
+        if os.path.exists(self.legacy_csv_path):
+            # One-off migration from the old CSV output
+            print("Converting existing processed data...")
+            return CorpusStore.write(pd.read_csv(self.legacy_csv_path), self.corpus_path)
+        
+        print("Processing MedQuAD dataset...")
+        self.process_dataset()
+        return CorpusStore.open(self.corpus_path)
+    
     def _get_sample_data(self) -> List[Dict]:
         """Sample medical Q&A data as fallback"""
         return [
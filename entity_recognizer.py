@@ -2,22 +2,25 @@ import re
 from typing import List, Dict, Set
 import nltk
 from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+from nltk.corpus import stopwords, words
 
 class MedicalEntityRecognizer:
     def __init__(self):
         self._download_nltk_data()
         self.medical_entities = self._load_medical_entities()
         self.stop_words = set(stopwords.words('english'))
+        self.english_words = {word.lower() for word in words.words()}
     
     def _download_nltk_data(self):
         """Download required NLTK data"""
         try:
             nltk.data.find('tokenizers/punkt')
             nltk.data.find('corpora/stopwords')
+            nltk.data.find('corpora/words')
         except LookupError:
             nltk.download('punkt')
             nltk.download('stopwords')
+            nltk.download('words')
     
     def _load_medical_entities(self) -> Dict[str, Set[str]]:
         """Load predefined medical entities"""
@@ -0,0 +1,162 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+
+class QueryNormalizer:
+    """Clean up user questions before retrieval.
+
+    Expands common medical abbreviations and corrects misspelled words
+    against the corpus vocabulary using a SymSpell-style deletion index:
+    every vocabulary word is stored under all of its deletions up to
+    ``max_edit_distance``, so a lookup only has to generate the deletions of
+    the query token instead of comparing it with the whole vocabulary.
+    """
+
+    ABBREVIATIONS = {
+        'bp': 'blood pressure',
+        'htn': 'hypertension',
+        'dm': 'diabetes',
+        't1d': 'type 1 diabetes',
+        't2d': 'type 2 diabetes',
+        'mi': 'heart attack',
+        'cad': 'coronary artery disease',
+        'chf': 'congestive heart failure',
+        'copd': 'chronic obstructive pulmonary disease',
+        'uti': 'urinary tract infection',
+        'ckd': 'chronic kidney disease',
+        'gerd': 'gastroesophageal reflux disease',
+        'ibs': 'irritable bowel syndrome',
+        'ra': 'rheumatoid arthritis',
+        'adhd': 'attention deficit hyperactivity disorder',
+        'tb': 'tuberculosis',
+        'sob': 'shortness of breath',
+        'meds': 'medications',
+        'otc': 'over-the-counter',
+        'rx': 'prescription',
+    }
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+    # Inflections stripped when looking a token up in the English word list
+    SUFFIXES = ('s', 'es', 'd', 'ed', 'ing', 'er', 'est', 'ly')
+
+    def __init__(self, vocabulary: Dict[str, int], protected_words: Iterable[str] = (),
+                 ignore_words: Iterable[str] = (), english_words: Iterable[str] = (),
+                 max_edit_distance: int = 2,
+                 prefix_length: int = 7, min_word_length: int = 4,
+                 min_suggestion_count: int = 2, cache_size: int = 10000):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.min_word_length = min_word_length
+        # Words seen fewer times are accepted as spelled but never suggested
+        self.min_suggestion_count = min_suggestion_count
+        self.word_counts = {word.lower(): count for word, count in vocabulary.items()}
+        # Words such as stop words that are left alone but never suggested
+        self.ignore_words = {word.lower() for word in ignore_words}
+        # General English words are valid spellings even if no question uses them
+        self.english_words = {word.lower() for word in english_words}
+
+        # Entity and abbreviation words are always valid and can be suggested,
+        # but rank by their real corpus count so they don't win every tie
+        for phrase in list(protected_words) + list(self.ABBREVIATIONS.values()):
+            for word in self.TOKEN_PATTERN.findall(phrase.lower()):
+                self.word_counts[word] = max(self.word_counts.get(word, 0), min_suggestion_count)
+
+        self.deletes = self._build_deletes()
+        self.correct_token = lru_cache(maxsize=cache_size)(self._correct_token)
+
+    @classmethod
+    def count_words(cls, texts: Iterable[str]) -> Dict[str, int]:
+        """Count the number of texts each word appears in"""
+        counts = Counter()
+        for text in texts:
+            counts.update(set(cls.TOKEN_PATTERN.findall(text.lower())))
+        return dict(counts)
+
+    def _is_english_word(self, token: str) -> bool:
+        """Check the English word list, allowing simple inflections such as -ed"""
+        if token in self.english_words:
+            return True
+        return any(token.endswith(suffix) and token[:-len(suffix)] in self.english_words
+                   for suffix in self.SUFFIXES)
+
+    def _build_deletes(self) -> Dict[str, List[str]]:
+        """Map every deletion of every vocabulary prefix to its source words"""
+        deletes = {}
+        for word, count in self.word_counts.items():
+            if len(word) < self.min_word_length or count < self.min_suggestion_count:
+                continue
+            for variant in self._deletions(word[:self.prefix_length]):
+                deletes.setdefault(variant, []).append(word)
+        return deletes
+
+    def _deletions(self, word: str) -> Set[str]:
+        """All strings reachable from word by up to max_edit_distance deletions"""
+        result = {word}
+        frontier = {word}
+        for _ in range(self.max_edit_distance):
+            next_frontier = set()
+            for item in frontier:
+                if len(item) <= 1:
+                    continue
+                for i in range(len(item)):
+                    next_frontier.add(item[:i] + item[i + 1:])
+            next_frontier -= result
+            result |= next_frontier
+            frontier = next_frontier
+        return result
+
+    def _correct_token(self, token: str) -> str:
+        """Return the closest vocabulary word, or the token itself"""
+        if (token in self.word_counts or token in self.ignore_words
+                or len(token) < self.min_word_length or not token.isalpha()
+                or self._is_english_word(token)):
+            return token
+
+        # Short words get a tighter budget to avoid turning them into other words
+        max_distance = 1 if len(token) <= 5 else self.max_edit_distance
+
+        candidates = set()
+        for variant in self._deletions(token[:self.prefix_length]):
+            candidates.update(self.deletes.get(variant, ()))
+
+        best = None
+        best_key = None
+        for candidate in candidates:
+            if abs(len(candidate) - len(token)) > max_distance:
+                continue
+            distance = self._edit_distance(token, candidate, max_distance)
+            if distance is None:
+                continue
+            key = (distance, -self.word_counts[candidate])
+            if best_key is None or key < best_key:
+                best, best_key = candidate, key
+
+        return best if best is not None else token
+
+    @staticmethod
+    def _edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+        """Damerau-Levenshtein (optimal string alignment) distance, or None if above max_distance"""
+        previous_row = None
+        row = list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            prev_prev_row, previous_row = previous_row, row
+            row = [i] + [0] * len(b)
+            for j in range(1, len(b) + 1):
+                cost = 0 if a[i - 1] == b[j - 1] else 1
+                row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+                if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                    row[j] = min(row[j], prev_prev_row[j - 2] + 1)
+            if min(row) > max_distance:
+                return None
+        return row[-1] if row[-1] <= max_distance else None
+
+    def normalize(self, text: str) -> str:
+        """Lowercase, expand abbreviations and fix spelling in a query"""
+        def replace(match):
+            token = match.group(0)
+            if token in self.ABBREVIATIONS:
+                return self.ABBREVIATIONS[token]
+            return self.correct_token(token)
+
+        return self.TOKEN_PATTERN.sub(replace, text.lower())
@@ -1,10 +1,11 @@
-import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import pickle
 import os
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from corpus_store import CorpusStore
+from query_normalizer import QueryNormalizer
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -16,7 +17,7 @@ except ImportError:
 
 class MedicalRetriever:
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
-        self.qa_data = None
+        self.corpus = None
         self.use_advanced = USE_ADVANCED
         
         if self.use_advanced:
@@ -27,10 +28,10 @@ class MedicalRetriever:
             self.vectorizer = TfidfVectorizer(max_features=5000, stop_words='english')
             self.tfidf_matrix = None
         
-    def build_index(self, qa_df: pd.DataFrame, save_path: str = "data/retrieval_index"):
+    def build_index(self, corpus: CorpusStore, save_path: str = "data/retrieval_index"):
         """Build search index from Q&A data"""
-        self.qa_data = qa_df
-        questions = qa_df['question'].tolist()
+        self.corpus = corpus
+        questions = corpus.column('question')
         
         if self.use_advanced:
             return self._build_faiss_index(questions, save_path)
@@ -50,14 +51,18 @@ class MedicalRetriever:
         
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         faiss.write_index(self.index, f"{save_path}.faiss")
+        self._save_faiss_data(save_path)
         
+        print(f"FAISS index built with {len(questions)} questions")
+    
+    def _save_faiss_data(self, save_path):
+        """Save embeddings alongside the FAISS index"""
         with open(f"{save_path}.pkl", 'wb') as f:
             pickle.dump({
-                'qa_data': self.qa_data,
+                'num_rows': len(self.corpus),
+                'fingerprint': self.corpus.fingerprint,
                 'embeddings': self.embeddings
             }, f)
-        
-        print(f"FAISS index built with {len(questions)} questions")
     
     def _build_tfidf_index(self, questions, save_path):
         """Build TF-IDF index"""
@@ -65,17 +70,23 @@ class MedicalRetriever:
         self.tfidf_matrix = self.vectorizer.fit_transform(questions)
         
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        self._save_tfidf_data(save_path)
+        
+        print(f"TF-IDF index built with {len(questions)} questions")
+    
+    def _save_tfidf_data(self, save_path):
+        """Save the fitted vectorizer and TF-IDF matrix"""
         with open(f"{save_path}_tfidf.pkl", 'wb') as f:
             pickle.dump({
-                'qa_data': self.qa_data,
+                'num_rows': len(self.corpus),
+                'fingerprint': self.corpus.fingerprint,
                 'vectorizer': self.vectorizer,
                 'tfidf_matrix': self.tfidf_matrix
             }, f)
-        
-        print(f"TF-IDF index built with {len(questions)} questions")
     
-    def load_index(self, save_path: str = "data/retrieval_index"):
+    def load_index(self, corpus: CorpusStore, save_path: str = "data/retrieval_index"):
         """Load pre-built index"""
+        self.corpus = corpus
         try:
             if self.use_advanced and os.path.exists(f"{save_path}.faiss"):
                 return self._load_faiss_index(save_path)
@@ -93,8 +104,14 @@ class MedicalRetriever:
         
         with open(f"{save_path}.pkl", 'rb') as f:
             data = pickle.load(f)
-            self.qa_data = data['qa_data']
-            self.embeddings = data['embeddings']
+        
+        if not self._matches_corpus(data):
+            return False
+        
+        self.embeddings = data['embeddings']
+        if 'qa_data' in data:
+            self._save_faiss_data(save_path)
+            print("Upgraded FAISS index file to the corpus store format")
         
         print("FAISS index loaded successfully")
         return True
@@ -103,43 +120,81 @@ class MedicalRetriever:
         """Load TF-IDF index"""
         with open(f"{save_path}_tfidf.pkl", 'rb') as f:
             data = pickle.load(f)
-            self.qa_data = data['qa_data']
-            self.vectorizer = data['vectorizer']
-            self.tfidf_matrix = data['tfidf_matrix']
+        
+        if not self._matches_corpus(data):
+            return False
+        
+        self.vectorizer = data['vectorizer']
+        self.tfidf_matrix = data['tfidf_matrix']
+        if 'qa_data' in data:
+            self._save_tfidf_data(save_path)
+            print("Upgraded TF-IDF index file to the corpus store format")
         
         print("TF-IDF index loaded successfully")
         return True
     
-    def retrieve(self, query: str, top_k: int = 5) -> List[Dict]:
+    def _matches_corpus(self, data: Dict) -> bool:
+        """Check that a saved index was built from the current corpus"""
+        if 'qa_data' in data:
+            # Older index files pickled the whole DataFrame; keep them only if
+            # their questions line up row for row, so they can be re-saved
+            questions = data['qa_data']['question'].fillna('').astype(str).tolist()
+            matches = questions == self.corpus.column('question')
+        else:
+            matches = (data.get('num_rows') == len(self.corpus)
+                       and data.get('fingerprint') == self.corpus.fingerprint)
+        
+        if not matches:
+            print("Index does not match processed data, rebuilding")
+        return matches
+    
+    def get_vocabulary(self) -> Dict[str, int]:
+        """Get every question word with its document frequency"""
+        # Built from the questions rather than the TF-IDF vocabulary, which is
+        # capped by max_features and would miss rare disease and drug names
+        return QueryNormalizer.count_words(self.corpus.column('question'))
+    
+    def _make_result(self, idx: int, score: float, rank: int) -> Dict:
+        """Fetch a hit's columns from the corpus store"""
+        row = self.corpus.row(int(idx), ['question', 'answer', 'source'])
+        row['score'] = float(score)
+        row['rank'] = rank
+        row['index'] = int(idx)
+        return row
+    
+    def encode_query(self, query: str) -> Optional[np.ndarray]:
+        """Get the normalized query embedding, or None for the TF-IDF backend"""
+        if not (self.use_advanced and self.index is not None):
+            return None
+        
+        query_embedding = self.model.encode([query]).astype('float32')
+        faiss.normalize_L2(query_embedding)
+        return query_embedding
+    
+    def retrieve(self, query: str, top_k: int = 5,
+                 query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """Retrieve most relevant Q&A pairs"""
-        if self.qa_data is None:
+        if self.corpus is None:
             return []
         
         if self.use_advanced and self.index is not None:
-            return self._retrieve_faiss(query, top_k)
+            return self._retrieve_faiss(query, top_k, query_embedding)
         elif self.tfidf_matrix is not None:
             return self._retrieve_tfidf(query, top_k)
         else:
             return []
     
-    def _retrieve_faiss(self, query, top_k):
+    def _retrieve_faiss(self, query, top_k, query_embedding=None):
         """Retrieve using FAISS"""
-        query_embedding = self.model.encode([query])
-        faiss.normalize_L2(query_embedding)
+        if query_embedding is None:
+            query_embedding = self.encode_query(query)
         
         scores, indices = self.index.search(query_embedding.astype('float32'), top_k)
         
         results = []
         for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx < len(self.qa_data):
-                result = {
-                    'question': self.qa_data.iloc[idx]['question'],
-                    'answer': self.qa_data.iloc[idx]['answer'],
-                    'source': self.qa_data.iloc[idx]['source'],
-                    'score': float(score),
-                    'rank': i + 1
-                }
-                results.append(result)
+            if 0 <= idx < len(self.corpus):
+                results.append(self._make_result(idx, score, i + 1))
         
         return results
     
@@ -153,20 +208,14 @@ class MedicalRetriever:
         results = []
         for i, idx in enumerate(top_indices):
             if similarities[idx] > 0:
-                result = {
-                    'question': self.qa_data.iloc[idx]['question'],
-                    'answer': self.qa_data.iloc[idx]['answer'],
-                    'source': self.qa_data.iloc[idx]['source'],
-                    'score': float(similarities[idx]),
-                    'rank': i + 1
-                }
-                results.append(result)
+                results.append(self._make_result(idx, similarities[idx], i + 1))
         
         return results
     
-    def get_best_answer(self, query: str, threshold: float = 0.3) -> Dict:
+    def get_best_answer(self, query: str, threshold: float = 0.3,
+                        query_embedding: Optional[np.ndarray] = None) -> Dict:
         """Get the best answer for a query"""
-        results = self.retrieve(query, top_k=1)
+        results = self.retrieve(query, top_k=1, query_embedding=query_embedding)
         
         if results and results[0]['score'] >= threshold:
             return results[0]
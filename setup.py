@@ -31,6 +31,7 @@ def download_nltk_data():
         print("Downloading NLTK data...")
         nltk.download('punkt', quiet=True)
         nltk.download('stopwords', quiet=True)
+        nltk.download('words', quiet=True)
         print("NLTK data downloaded successfully!")
     except Exception as e:
         print(f"Warning: Could not download NLTK data: {e}")